@@ -1,48 +1,129 @@
-from flask import Flask, request, render_template_string, jsonify
-import json
-
-app = Flask(__name__)
-MEDICINES_FILE = r"C:\Users\Lenovo\OneDrive\Desktop\medivoice-ai\data\medicine_dataset_detailed.json"
-
-# Load dataset
-with open(MEDICINES_FILE, 'r', encoding='utf-8') as f:
-    medicines = json.load(f)
+from quart import Quart, Response, request, jsonify
+from quart.json.provider import DefaultJSONProvider
+import os
+import re
+from bisect import bisect_right
+from collections import defaultdict
+from functools import lru_cache
+import orjson
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes responses and decodes request bodies with orjson"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+app = Quart(__name__)
+app.json = OrjsonProvider(app)
+MEDICINES_FILE = os.getenv("MEDICINES_FILE", os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "medicine_dataset_detailed.json"))
+
+# Load dataset once per worker at import
+with open(MEDICINES_FILE, 'rb') as f:
+    medicines = orjson.loads(f.read())
+
+# Longest names first, so the whole-name and partial-name lookups below
+# prefer the most specific match ("Paracetamol Plus" over "Paracetamol").
+# dataset_order[i] is the original position of medicines[i]; the token
+# fallback ranks by it so filler words don't favour the longest names
+dataset_order = sorted(range(len(medicines)), key=lambda i: len(medicines[i]['name']), reverse=True)
+medicines = [medicines[i] for i in dataset_order]
+
+# Lowercased names live in a list parallel to `medicines`, so the scans
+# below walk one list of strings instead of looking a key up in each dict
+medicine_names_lower = [m['name'].lower() for m in medicines]
+
+# One compiled alternation over all names finds any medicine named in the
+# transcript in a single search; longer names come first so they win
+name_index = {}
+for i, name in enumerate(medicine_names_lower):
+    name_index.setdefault(name, i)
+name_pattern = re.compile("|".join(
+    re.escape(name) for name in sorted(name_index, key=len, reverse=True)))
+
+# All names packed into one newline-separated buffer: a partial name is
+# located with a single C-level str.find, and name_starts maps the hit
+# offset back to its medicine
+name_buffer = "\n".join(medicine_names_lower)
+name_starts = []
+offset = 0
+for name in medicine_names_lower:
+    name_starts.append(offset)
+    offset += len(name) + 1
+neg_name_lengths = [-len(name) for name in medicine_names_lower]
+
+# Index every 1-3 character gram of a name to the medicines containing it,
+# so the token fallback only verifies medicines sharing a token's prefix
+name_grams = defaultdict(set)
+for i, name in enumerate(medicine_names_lower):
+    for n in range(1, 4):
+        for j in range(len(name) - n + 1):
+            name_grams[name[j:j + n]].add(i)
 
 # Helper to find medicine by partial match
 def find_medicine(transcript):
-    t = transcript.lower()
-    for m in medicines:
-        if t in m['name'].lower():
-            return m
-    tokens = t.split()
-    for m in medicines:
-        for token in tokens:
-            if token in m['name'].lower():
-                return m
+    i = _find_medicine_index(transcript.lower().strip())
+    return medicines[i] if i is not None else None
+
+# Cached on the normalized transcript; returns an index so the dataset
+# dicts never become part of the cache key or value
+@lru_cache(maxsize=4096)
+def _find_medicine_index(t):
+    match = name_pattern.search(t)
+    if match:
+        return name_index[match.group(0)]
+    if '\n' not in t:
+        # Only the leading names at least as long as t can contain it
+        count = bisect_right(neg_name_lengths, -len(t))
+        end = name_starts[count - 1] + len(medicine_names_lower[count - 1]) if count else 0
+        pos = name_buffer.find(t, 0, end)
+        if pos != -1:
+            return bisect_right(name_starts, pos) - 1
+    # Tokens of two characters or fewer ("of", "me") are not evidence of a name
+    tokens = [token for token in t.split() if len(token) > 2]
+    candidates = set().union(*(name_grams.get(token[:3], ()) for token in tokens))
+    for i in sorted(candidates, key=dataset_order.__getitem__):
+        if any(token in medicine_names_lower[i] for token in tokens):
+            return i
     return None
 
+# Keyword tables for get_requested_field. Single-word keywords live in
+# frozensets and are matched as word stems: each word of the query is cut
+# to every keyword length and the prefixes are intersected with the sets
+# ("used" counts as "use", "because" does not). Multi-word phrases are
+# matched by substring
+TRIGGER_PHRASES = ('hey murfmedu', 'hey medu', 'hey murf medu')
+USES_KW = frozenset({'use'})
+USES_PHRASES = ('kya karta', 'what is')
+PRESCRIPTION_KW = frozenset({'prescription', 'prescribe', 'doctor'})
+DOSAGE_KW = frozenset({'dosage', 'dose', 'overdose', 'underdose', 'kitni', 'kitna'})
+KW_LENGTHS = frozenset(len(kw) for kw in USES_KW | PRESCRIPTION_KW | DOSAGE_KW)
+WORD_RE = re.compile(r"[a-z]+")
+
 # Helper to get requested field
 def get_requested_field(transcript, med):
     q = transcript.lower()
     # Trigger phrases
-    triggers = ['hey murfmedu', 'hey medu', 'hey murf medu']
-    if any(t in q for t in triggers):
+    if any(t in q for t in TRIGGER_PHRASES):
         return "yes tell me"
-    # Medicine fields
+    # Medicine fields; punctuation is dropped so "dose?" still counts
+    q_stems = {w[:n] for w in WORD_RE.findall(q) for n in KW_LENGTHS}
     field = None
-    if any(w in q for w in ['use','uses','ka use','kya karta','what is']):
+    if USES_KW & q_stems or any(p in q for p in USES_PHRASES):
         field = 'uses'
-    elif any(w in q for w in ['prescription','prescribe','doctor']):
+    elif PRESCRIPTION_KW & q_stems:
         field = 'prescription'
-    elif any(w in q for w in ['dosage','dose','kitni','kitna']):
+    elif DOSAGE_KW & q_stems:
         field = 'dosage'
     if field and med.get(field):
         return f"{med['name']} - {med.get(field)}"
     return f"{med['name']} - Info not available for requested field"
 
-@app.route('/')
-def index():
-    return render_template_string("""
+# Static page, served as-is without going through Jinja
+INDEX_HTML = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -138,21 +219,35 @@ mic.onclick=()=>{ if(recognition) recognition.start(); }
 <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css"/>
 </body>
 </html>
-""")
+"""
+
+@app.route('/')
+async def index():
+    return Response(INDEX_HTML, mimetype='text/html',
+                    headers={'Cache-Control': 'public, max-age=3600'})
 
 @app.route('/query', methods=['POST'])
-def query_text():
-    data=request.get_json() or {}
+async def query_text():
+    data=await request.get_json(silent=True, cache=True) or {}
     txt=data.get('text','').strip()
     if not txt: return jsonify(error='No text provided'), 400
-    found=find_medicine(txt)
-    if found:
-        reply=get_requested_field(txt, found)
-    else:
-        reply="Medicine not found."
+    reply=_reply_for(txt.lower())
     return jsonify(reply=reply)
 
+# Repeated utterances skip matching entirely. txt arrives lowercased and
+# stripped, so it goes straight to the index lookup without re-normalizing
+@lru_cache(maxsize=4096)
+def _reply_for(txt):
+    i=_find_medicine_index(txt)
+    if i is not None:
+        return get_requested_field(txt, medicines[i])
+    return "Medicine not found."
+
+# Local development only; in production run under hypercorn (see Procfile).
+# Debugger and reloader stay off unless FLASK_DEBUG=1
 if __name__=='__main__':
-    app.run(debug=True)
+    debug = os.getenv('FLASK_DEBUG') == '1'
+    app.run(debug=debug, use_reloader=debug,
+            host=os.getenv('HOST', '127.0.0.1'), port=int(os.getenv('PORT', 5000)))
 
 
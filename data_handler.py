@@ -3,20 +3,87 @@ Utility module for handling external API calls
 """
 
 import os
+import re
+import hashlib
 import requests
 import aiohttp
 import asyncio
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import json
 from datetime import datetime
 import uuid
+from urllib.parse import urlencode, urlsplit
+from cachetools import TTLCache
 
-class MurfTTSHandler:
+# Deepgram query options shared by every transcription request
+DEEPGRAM_PARAMS = {
+    "language": "en-US",
+    "smart_format": "true",
+    "utterances": "true"
+}
+
+# Canned replies for the rule-based fallback, selected by the named group
+# of RULE_PATTERN that matches first in the prompt
+RULE_PATTERN = re.compile(
+    r"(?P<greet>\b(?:hello|hi|hey)\b)"
+    r"|(?P<thank>\bthank)"
+    r"|(?P<medicine>\b(?:medicine|drug|pill))"
+    r"|(?P<remind>\bremind)",
+    re.IGNORECASE
+)
+RULE_REPLIES = {
+    "greet": "Hello! I'm MediVoice AI. I can help you with medicine information, set reminders, and check interactions.",
+    "thank": "You're welcome! Let me know if you need any more help with medicines.",
+    "medicine": "I can help you find information about medicines. Please tell me the name of the medicine you're interested in.",
+    "remind": "I can help you set reminders for taking medicines. Please tell me the time and what you'd like to be reminded about."
+}
+
+class PooledSessionHandler:
+    """Base for handlers that reuse one aiohttp session across requests"""
+    
+    def __init__(self, max_concurrency: int = 8):
+        self._session: Optional[aiohttp.ClientSession] = None
+        # One semaphore per host caps in-flight requests at that provider's
+        # concurrency quota. Like the session they are created inside the
+        # running loop, since on Python < 3.10 a semaphore binds to the
+        # loop current at construction
+        self._max_concurrency = max_concurrency
+        self._semaphores: Optional[Dict[str, asyncio.Semaphore]] = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it and the semaphores on first use"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300,
+                                               keepalive_timeout=75),
+                timeout=aiohttp.ClientTimeout(total=15)
+            )
+            self._semaphores = {}
+        return self._session
+    
+    def _limit(self, url: str) -> asyncio.Semaphore:
+        """Return the concurrency semaphore for url's host; call after _get_session"""
+        host = urlsplit(url).netloc
+        if host not in self._semaphores:
+            self._semaphores[host] = asyncio.Semaphore(self._max_concurrency)
+        return self._semaphores[host]
+    
+    async def close(self):
+        """Close the shared session; call on application shutdown"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._semaphores = None
+
+class MurfTTSHandler(PooledSessionHandler):
     """Handler for Murf Text-to-Speech API"""
     
     def __init__(self, api_key: Optional[str] = None):
+        super().__init__()
         self.api_key = api_key or os.getenv("MURF_API_KEY")
         self.base_url = "https://api.murf.ai/v1/speech/generate"
+        # Audio bytes keyed by a hash of the text and voice settings
+        self._cache = TTLCache(maxsize=1024, ttl=3600)
         
     async def generate_speech(self, text: str, voice_id: str = "en-US-1", 
                              speed: float = 1.0, pitch: int = 0) -> Optional[bytes]:
@@ -25,6 +92,12 @@ class MurfTTSHandler:
             print("❌ Murf API key not configured")
             return None
         
+        cache_key = hashlib.blake2b(
+            f"{voice_id}|{speed}|{pitch}|{text[:1000]}".encode()
+        ).digest()
+        if cache_key in self._cache:
+            return self._cache[cache_key]
+        
         headers = {
             "api-key": self.api_key,
             "Content-Type": "application/json"
@@ -40,31 +113,40 @@ class MurfTTSHandler:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.base_url,
-                    json=payload,
-                    headers=headers,
-                    timeout=15
-                ) as response:
-                    if response.status == 200:
-                        audio_data = await response.read()
-                        return audio_data
-                    else:
-                        error_text = await response.text()
-                        print(f"❌ Murf API Error {response.status}: {error_text}")
-                        return None
+            session = await self._get_session()
+            async with self._limit(self.base_url), session.post(
+                self.base_url,
+                json=payload,
+                headers=headers
+            ) as response:
+                if response.status == 200:
+                    audio_data = await response.read()
+                    self._cache[cache_key] = audio_data
+                    return audio_data
+                else:
+                    error_text = await response.text()
+                    print(f"❌ Murf API Error {response.status}: {error_text}")
+                    return None
                         
         except Exception as e:
             print(f"❌ Murf TTS Error: {e}")
             return None
+    
+    async def generate_speech_batch(self, texts: List[str], **kwargs) -> List[Optional[bytes]]:
+        """Generate speech for several texts concurrently, in input order"""
+        return await asyncio.gather(
+            *(self.generate_speech(text, **kwargs) for text in texts)
+        )
 
-class DeepgramASRHandler:
+class DeepgramASRHandler(PooledSessionHandler):
     """Handler for Deepgram Speech-to-Text API"""
     
     def __init__(self, api_key: Optional[str] = None):
+        super().__init__()
         self.api_key = api_key or os.getenv("DEEPGRAM_API_KEY")
         self.base_url = "https://api.deepgram.com/v1/listen"
+        # Transcripts keyed by a hash of the audio and model
+        self._cache = TTLCache(maxsize=1024, ttl=3600)
         
     async def transcribe_audio(self, audio_data: bytes, 
                               model: str = "nova-2") -> Optional[str]:
@@ -73,48 +155,46 @@ class DeepgramASRHandler:
             print("❌ Deepgram API key not configured")
             return None
         
+        hasher = hashlib.blake2b(f"{model}|".encode())
+        hasher.update(audio_data)
+        cache_key = hasher.digest()
+        if cache_key in self._cache:
+            return self._cache[cache_key]
+        
         headers = {
             "Authorization": f"Token {self.api_key}",
             "Content-Type": "audio/wav"
         }
         
-        params = {
-            "model": model,
-            "language": "en-US",
-            "smart_format": "true",
-            "utterances": "true"
-        }
+        query = urlencode({"model": model, **DEEPGRAM_PARAMS})
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}?{self._build_query(params)}",
-                    data=audio_data,
-                    headers=headers,
-                    timeout=15
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        if 'results' in result and 'channels' in result['results']:
-                            transcript = result['results']['channels'][0]['alternatives'][0]['transcript']
-                            return transcript.strip()
-                    else:
-                        error_text = await response.text()
-                        print(f"❌ Deepgram ASR Error {response.status}: {error_text}")
+            session = await self._get_session()
+            async with self._limit(self.base_url), session.post(
+                f"{self.base_url}?{query}",
+                data=audio_data,
+                headers=headers
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    if 'results' in result and 'channels' in result['results']:
+                        transcript = result['results']['channels'][0]['alternatives'][0]['transcript'].strip()
+                        self._cache[cache_key] = transcript
+                        return transcript
+                else:
+                    error_text = await response.text()
+                    print(f"❌ Deepgram ASR Error {response.status}: {error_text}")
                         
         except Exception as e:
             print(f"❌ Deepgram ASR Error: {e}")
         
         return None
-    
-    def _build_query(self, params: Dict) -> str:
-        """Build URL query string from parameters"""
-        return "&".join([f"{k}={v}" for k, v in params.items()])
 
-class LLMHandler:
+class LLMHandler(PooledSessionHandler):
     """Handler for LLM APIs (OpenAI, Groq, etc.)"""
     
     def __init__(self):
+        super().__init__()
         self.openai_key = os.getenv("OPENAI_API_KEY")
         self.groq_key = os.getenv("GROQ_API_KEY")
         
@@ -143,6 +223,7 @@ class LLMHandler:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
         
+        url = "https://api.openai.com/v1/chat/completions"
         payload = {
             "model": "gpt-3.5-turbo",
             "messages": messages,
@@ -151,16 +232,15 @@ class LLMHandler:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    json=payload,
-                    headers=headers,
-                    timeout=15
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result["choices"][0]["message"]["content"]
+            session = await self._get_session()
+            async with self._limit(url), session.post(
+                url,
+                json=payload,
+                headers=headers
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return result["choices"][0]["message"]["content"]
         except Exception as e:
             print(f"OpenAI API Error: {e}")
         
@@ -178,6 +258,7 @@ class LLMHandler:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
         
+        url = "https://api.groq.com/openai/v1/chat/completions"
         payload = {
             "model": "llama3-70b-8192",
             "messages": messages,
@@ -186,16 +267,15 @@ class LLMHandler:
         }
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    "https://api.groq.com/openai/v1/chat/completions",
-                    json=payload,
-                    headers=headers,
-                    timeout=15
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result["choices"][0]["message"]["content"]
+            session = await self._get_session()
+            async with self._limit(url), session.post(
+                url,
+                json=payload,
+                headers=headers
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return result["choices"][0]["message"]["content"]
         except Exception as e:
             print(f"Groq API Error: {e}")
         
@@ -203,18 +283,8 @@ class LLMHandler:
     
     def _generate_rule_based_response(self, prompt: str) -> str:
         """Generate rule-based response when LLM is not available"""
-        prompt_lower = prompt.lower()
-        
-        if any(word in prompt_lower for word in ["hello", "hi", "hey"]):
-            return "Hello! I'm MediVoice AI. I can help you with medicine information, set reminders, and check interactions."
-        
-        if "thank" in prompt_lower:
-            return "You're welcome! Let me know if you need any more help with medicines."
-        
-        if any(word in prompt_lower for word in ["medicine", "drug", "pill"]):
-            return "I can help you find information about medicines. Please tell me the name of the medicine you're interested in."
-        
-        if "remind" in prompt_lower:
-            return "I can help you set reminders for taking medicines. Please tell me the time and what you'd like to be reminded about."
+        match = RULE_PATTERN.search(prompt)
+        if match:
+            return RULE_REPLIES[match.lastgroup]
         
         return f"I understand you're asking: '{prompt}'. I'm your medical assistant. I can help with medicine information, reminders, and checking interactions between medicines."
\ No newline at end of file
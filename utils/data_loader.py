@@ -1,164 +1,392 @@
 """
 Utility module for loading and managing medicine data from CSV files
+
+Run `python -m utils.data_loader migrate` to snapshot data/medicines.csv
+into data/medicines.json, which is then loaded in preference to the CSV.
 """
 
 import csv
 import os
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+import pickle
+import re
+import sys
+from functools import cached_property, lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Set
-import pandas as pd
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import orjson
+
+MEDICINE_COLUMNS = (
+    'name', 'generic_name', 'class', 'uses', 'dosage_adults', 'dosage_children',
+    'side_effects', 'contraindications', 'interactions', 'pregnancy', 'storage',
+    'brand_names', 'mechanism', 'onset', 'duration'
+)
+INTERACTION_COLUMNS = ('medicine1', 'medicine2', 'severity', 'effect', 'recommendation', 'mechanism')
+BRAND_COLUMNS = ('generic_name', 'brand_name', 'company', 'form', 'strength', 'price_range')
+
+def _read_rows(path: Path, columns: Sequence[str], required: int = 1) -> Iterator[Tuple[str, ...]]:
+    """
+    Yield CSV rows as plain tuples ordered like `columns`.
+    The first `required` columns must be present; any other column missing
+    from the header reads as ''.
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        width = len(header)
+        for column in columns[:required]:
+            if column not in header:
+                raise KeyError(column)
+        # Missing columns point at the '' padded onto the end of each row;
+        # extra trailing fields are cut first so they can't land in that slot
+        getter = itemgetter(*(header.index(c) if c in header else width for c in columns))
+        for row in reader:
+            if not row:
+                continue
+            del row[width:]
+            row.extend([''] * (width + 1 - len(row)))
+            yield getter(row)
+
+# Splits on ';' and strips the surrounding whitespace in the same C-level pass
+_SPLIT_ITEMS = re.compile(r'\s*;\s*').split
+
+def _split(value: Optional[str]) -> List[str]:
+    """Split a ';'-separated CSV cell into a list of non-empty items"""
+    if not value:
+        return []
+    value = value.strip()
+    # Single-item cells are common; skip the regex for them
+    if ';' not in value:
+        return [value] if value else []
+    return [v for v in _SPLIT_ITEMS(value) if v]
+
+@dataclass
+class Medicine:
+    """A medicine record, slotted so the table stays compact"""
+    
+    __slots__ = (
+        'name', 'generic_name', 'class_', 'uses', 'dosage_adults', 'dosage_children',
+        'side_effects', 'contraindications', 'interactions', 'pregnancy', 'storage',
+        'brand_names', 'mechanism', 'onset', 'duration'
+    )
+    # Fields stored as tuples of items rather than lists
+    LIST_FIELDS = ('uses', 'side_effects', 'contraindications', 'interactions', 'brand_names')
+    
+    name: str
+    generic_name: str
+    class_: str
+    uses: Tuple[str, ...]
+    dosage_adults: str
+    dosage_children: str
+    side_effects: Tuple[str, ...]
+    contraindications: Tuple[str, ...]
+    interactions: Tuple[str, ...]
+    pregnancy: str
+    storage: str
+    brand_names: Tuple[str, ...]
+    mechanism: str
+    onset: str
+    duration: str
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Medicine":
+        """Build from the dict form used by the JSON snapshot ('class' key, lists)"""
+        fields = {('class_' if k == 'class' else k): v for k, v in data.items()}
+        for field in cls.LIST_FIELDS:
+            fields[field] = tuple(fields[field])
+        return cls(**fields)
+    
+    def to_dict(self) -> Dict:
+        """Dict form with a 'class' key and lists, as written to the JSON snapshot"""
+        data = {('class' if k == 'class_' else k): getattr(self, k) for k in self.__slots__}
+        for field in self.LIST_FIELDS:
+            data[field] = list(data[field])
+        return data
+
+def _parse_medicines_csv(med_file: Path) -> Dict[str, Medicine]:
+    """Parse medicines.csv into Medicine records keyed by lowercase name; raises on bad input"""
+    medicines: Dict[str, Medicine] = {}
+    # Identical item tuples (e.g. common side effects) share one object
+    shared: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+    
+    def items(cell: str) -> Tuple[str, ...]:
+        value = tuple(_split(cell))
+        return shared.setdefault(value, value)
+    
+    for (name, generic_name, med_class, uses, dosage_adults, dosage_children,
+         side_effects, contraindications, interactions, pregnancy, storage,
+         brand_names, mechanism, onset, duration) in _read_rows(med_file, MEDICINE_COLUMNS):
+        medicine_name = sys.intern(name.lower().strip())
+        
+        medicines[medicine_name] = Medicine(
+            name=name,
+            generic_name=generic_name or name,
+            class_=med_class or 'Unknown',
+            uses=items(uses),
+            dosage_adults=dosage_adults or 'Not specified',
+            dosage_children=dosage_children or 'Not specified',
+            side_effects=items(side_effects),
+            contraindications=items(contraindications),
+            interactions=items(interactions),
+            pregnancy=pregnancy or 'Not specified',
+            storage=storage or 'Room temperature',
+            brand_names=items(brand_names),
+            mechanism=mechanism or 'Not specified',
+            onset=onset or 'Not specified',
+            duration=duration or 'Not specified'
+        )
+    return medicines
 
 class MedicineDataLoader:
     """Loads and manages medicine data from CSV files"""
     
+    # Bump when the cached attributes change shape so stale caches are ignored
+    _CACHE_VERSION = 4
+    _CACHED_ATTRS = (
+        'medicines', '_by_generic_lower', '_by_brand_lower', '_by_class',
+        '_names_lc', '_entries',
+        '_names_buffer', '_names_starts', '_names_pattern'
+    )
+    
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
-        self.medicines = {}
-        self.interactions = {}
-        self.brands = {}
+        self.medicines: Dict[str, Medicine] = {}
+        # Lowercase generic/brand/class name -> medicines, built by _build_indexes
+        self._by_generic_lower: Dict[str, List[Medicine]] = {}
+        self._by_brand_lower: Dict[str, List[Medicine]] = {}
+        self._by_class: Dict[str, List[Medicine]] = {}
+        # Parallel lists (one slot per medicine) for bulk substring scans
+        self._names_lc: List[str] = []
+        self._entries: List[Medicine] = []
+        # Partial-name matchers over _names_lc, built by _build_indexes
+        self._names_buffer = ""
+        self._names_starts: List[int] = []
+        self._names_pattern: Optional[re.Pattern] = None
+        # Interactions and brands parse on background threads while the
+        # medicines load here; their properties wait for the result
+        executor = ThreadPoolExecutor(max_workers=2)
+        self._interactions_future = executor.submit(self._load_interactions)
+        self._brands_future = executor.submit(self._load_brands)
+        executor.shutdown(wait=False)
         self._load_data()
+        # Memoize lookups per instance; call .cache_clear() on both if the
+        # data is ever reloaded
+        self.search_medicine = lru_cache(maxsize=1024)(self._search_medicine_impl)
+        self.check_interaction = lru_cache(maxsize=1024)(self._check_interaction_impl)
     
     def _load_data(self):
-        """Load all CSV data files"""
-        self._load_medicines()
-        self._load_interactions()
-        self._load_brands()
+        """Load the medicines data; interactions and brands load in the background"""
+        json_file = self.data_dir / "medicines.json"
+        csv_file = self.data_dir / "medicines.csv"
+        med_file = json_file if json_file.exists() else csv_file
+        if med_file is json_file and csv_file.exists() and \
+                csv_file.stat().st_mtime_ns > json_file.stat().st_mtime_ns:
+            print(f"Warning: {csv_file} is newer than {json_file}; loading the CSV "
+                  f"(run `python -m utils.data_loader migrate` to refresh the snapshot)")
+            med_file = csv_file
+        state = self._read_cache(med_file)
+        if state is not None:
+            for attr in self._CACHED_ATTRS:
+                setattr(self, attr, state[attr])
+            print(f"✓ Loaded {len(self.medicines)} medicines from cache")
+            return
+        
+        if med_file is json_file:
+            loaded = self._load_medicines_json(json_file)
+        else:
+            loaded = self._load_medicines()
+        self._build_indexes()
+        if loaded:
+            self._write_cache(med_file, {attr: getattr(self, attr) for attr in self._CACHED_ATTRS})
+    
+    def _cache_file(self, source: Path) -> Path:
+        """Pickle cache location for a source data file"""
+        return self.data_dir / ".cache" / f"{source.name}.pkl"
+    
+    def _signature(self, source: Path) -> Tuple[int, int, int]:
+        """Cache format, modification time and size identifying a data file version"""
+        stat = source.stat()
+        return self._CACHE_VERSION, stat.st_mtime_ns, stat.st_size
+    
+    def _read_cache(self, source: Path):
+        """Return the cached state for source, or None if missing or stale"""
+        try:
+            with open(self._cache_file(source), 'rb') as f:
+                cached = pickle.load(f)
+            if cached['sig'] == self._signature(source):
+                return cached['state']
+        except Exception:
+            pass
+        return None
+    
+    def _write_cache(self, source: Path, state):
+        """Pickle state next to the data, tagged with the source signature"""
+        cache_file = self._cache_file(source)
+        try:
+            cache_file.parent.mkdir(exist_ok=True)
+            tmp_file = cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump({'sig': self._signature(source), 'state': state}, f,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            print(f"Warning: could not write cache {cache_file}: {e}")
     
-    def _load_medicines(self):
-        """Load medicines from CSV"""
+    @cached_property
+    def interactions(self) -> Dict[frozenset, Dict]:
+        """Interaction table, parsed from CSV in the background"""
+        return self._interactions_future.result()
+    
+    @cached_property
+    def brands(self) -> Dict[str, List[Dict]]:
+        """Brand entries by lowercase generic name, parsed from CSV in the background"""
+        return self._brands_future.result()
+    
+    def _load_medicines_json(self, json_file: Path) -> bool:
+        """Load medicines from the JSON snapshot, falling back to the CSV"""
+        try:
+            self.medicines = {
+                sys.intern(med['name'].lower().strip()): Medicine.from_dict(med)
+                for med in orjson.loads(json_file.read_bytes())
+            }
+            print(f"✓ Loaded {len(self.medicines)} medicines from JSON")
+            return True
+            
+        except Exception as e:
+            print(f"Error loading medicines JSON: {e}")
+            self.medicines = {}
+            return self._load_medicines()
+    
+    def _load_medicines(self) -> bool:
+        """Load medicines from CSV; returns False if sample data was used"""
         med_file = self.data_dir / "medicines.csv"
         
         if not med_file.exists():
             print(f"Warning: {med_file} not found. Creating sample data...")
             self._create_sample_medicines()
-            return
+            return False
         
         try:
-            df = pd.read_csv(med_file)
-            
-            for _, row in df.iterrows():
-                medicine_name = row['name'].lower().strip()
-                
-                # Parse uses as list
-                uses = []
-                if 'uses' in df.columns and pd.notna(row['uses']):
-                    uses = [u.strip() for u in str(row['uses']).split(';') if u.strip()]
-                
-                # Parse side effects as list
-                side_effects = []
-                if 'side_effects' in df.columns and pd.notna(row['side_effects']):
-                    side_effects = [se.strip() for se in str(row['side_effects']).split(';') if se.strip()]
-                
-                # Parse contraindications as list
-                contraindications = []
-                if 'contraindications' in df.columns and pd.notna(row['contraindications']):
-                    contraindications = [c.strip() for c in str(row['contraindications']).split(';') if c.strip()]
-                
-                # Parse interactions as list
-                interactions = []
-                if 'interactions' in df.columns and pd.notna(row['interactions']):
-                    interactions = [i.strip() for i in str(row['interactions']).split(';') if i.strip()]
-                
-                # Parse brand names as list
-                brand_names = []
-                if 'brand_names' in df.columns and pd.notna(row['brand_names']):
-                    brand_names = [b.strip() for b in str(row['brand_names']).split(';') if b.strip()]
-                
-                self.medicines[medicine_name] = {
-                    'name': row['name'],
-                    'generic_name': row.get('generic_name', row['name']),
-                    'class': row.get('class', 'Unknown'),
-                    'uses': uses,
-                    'dosage_adults': row.get('dosage_adults', 'Not specified'),
-                    'dosage_children': row.get('dosage_children', 'Not specified'),
-                    'side_effects': side_effects,
-                    'contraindications': contraindications,
-                    'interactions': interactions,
-                    'pregnancy': row.get('pregnancy', 'Not specified'),
-                    'storage': row.get('storage', 'Room temperature'),
-                    'brand_names': brand_names,
-                    'mechanism': row.get('mechanism', 'Not specified'),
-                    'onset': row.get('onset', 'Not specified'),
-                    'duration': row.get('duration', 'Not specified')
-                }
-            
+            self.medicines = _parse_medicines_csv(med_file)
             print(f"✓ Loaded {len(self.medicines)} medicines from CSV")
+            return True
             
         except Exception as e:
             print(f"Error loading medicines CSV: {e}")
             self._create_sample_medicines()
+            return False
     
-    def _load_interactions(self):
+    def _load_interactions(self) -> Dict[frozenset, Dict]:
         """Load medicine interactions from CSV"""
         int_file = self.data_dir / "interactions.csv"
         
         if not int_file.exists():
             print(f"Warning: {int_file} not found. Creating sample interactions...")
-            self._create_sample_interactions()
-            return
+            return self._create_sample_interactions()
         
         try:
-            df = pd.read_csv(int_file)
-            
-            for _, row in df.iterrows():
-                med1 = row['medicine1'].lower().strip()
-                med2 = row['medicine2'].lower().strip()
-                
-                # Store in both directions
-                key1 = (med1, med2)
-                key2 = (med2, med1)
+            interactions = {}
+            count = 0
+            for (medicine1, medicine2, severity, effect, recommendation,
+                 mechanism) in _read_rows(int_file, INTERACTION_COLUMNS, required=2):
+                med1 = medicine1.lower().strip()
+                med2 = medicine2.lower().strip()
                 
                 interaction_data = {
-                    'severity': row.get('severity', 'Unknown'),
-                    'effect': row.get('effect', 'Interaction present'),
-                    'recommendation': row.get('recommendation', 'Consult doctor'),
-                    'mechanism': row.get('mechanism', 'Not specified')
+                    'severity': severity or 'Unknown',
+                    'effect': effect or 'Interaction present',
+                    'recommendation': recommendation or 'Consult doctor',
+                    'mechanism': mechanism or 'Not specified'
                 }
                 
-                self.interactions[key1] = interaction_data
-                self.interactions[key2] = interaction_data
+                # One unordered key serves both directions
+                interactions[frozenset((med1, med2))] = interaction_data
+                count += 1
             
-            print(f"✓ Loaded {len(df)} interactions from CSV")
+            print(f"✓ Loaded {count} interactions from CSV")
+            return interactions
             
         except Exception as e:
             print(f"Error loading interactions CSV: {e}")
-            self._create_sample_interactions()
+            return self._create_sample_interactions()
     
-    def _load_brands(self):
+    def _load_brands(self) -> Dict[str, List[Dict]]:
         """Load brand names from CSV"""
         brand_file = self.data_dir / "brands.csv"
+        brands = {}
         
         if not brand_file.exists():
             print(f"Warning: {brand_file} not found. Skipping brands.")
-            return
+            return brands
         
         try:
-            df = pd.read_csv(brand_file)
-            
-            for _, row in df.iterrows():
-                generic = row['generic_name'].lower().strip()
-                brand = row['brand_name'].strip()
+            count = 0
+            for (generic_name, brand_name, company, form, strength,
+                 price_range) in _read_rows(brand_file, BRAND_COLUMNS, required=2):
+                generic = generic_name.lower().strip()
+                brand = brand_name.strip()
                 
-                if generic not in self.brands:
-                    self.brands[generic] = []
+                if generic not in brands:
+                    brands[generic] = []
                 
-                self.brands[generic].append({
+                brands[generic].append({
                     'brand_name': brand,
-                    'company': row.get('company', 'Unknown'),
-                    'form': row.get('form', 'Tablet'),
-                    'strength': row.get('strength', ''),
-                    'price_range': row.get('price_range', 'Medium')
+                    'company': company or 'Unknown',
+                    'form': form or 'Tablet',
+                    'strength': strength,
+                    'price_range': price_range or 'Medium'
                 })
+                count += 1
             
-            print(f"✓ Loaded {len(df)} brand entries from CSV")
+            print(f"✓ Loaded {count} brand entries from CSV")
             
         except Exception as e:
             print(f"Error loading brands CSV: {e}")
+        
+        return brands
+    
+    def _build_indexes(self):
+        """Index medicines by lowercase generic name, brand name and class"""
+        self._by_generic_lower = {}
+        self._by_brand_lower = {}
+        self._by_class = {}
+        # Keys are interned once at load time so a name shared by several
+        # indexes is stored once; user queries are deliberately not interned
+        for med_data in self.medicines.values():
+            class_lower = sys.intern(med_data.class_.lower())
+            self._by_class.setdefault(class_lower, []).append(med_data)
+            generic_lower = sys.intern(med_data.generic_name.lower())
+            self._by_generic_lower.setdefault(generic_lower, []).append(med_data)
+            for brand in med_data.brand_names:
+                brand_lower = sys.intern(brand.lower())
+                self._by_brand_lower.setdefault(brand_lower, []).append(med_data)
+        # self.medicines is already keyed by lowercase name
+        self._names_lc = list(self.medicines)
+        self._entries = list(self.medicines.values())
+        
+        # A query inside a name is found with one str.find over all names
+        # joined by newlines; _names_starts maps the hit back to its slot
+        self._names_buffer = "\n".join(self._names_lc)
+        self._names_starts = []
+        offset = 0
+        for name_lc in self._names_lc:
+            self._names_starts.append(offset)
+            offset += len(name_lc) + 1
+        # A name inside the query is found with one compiled alternation,
+        # longest names first so the most specific one wins
+        self._names_pattern = re.compile("|".join(
+            re.escape(name_lc) for name_lc in sorted(self._names_lc, key=len, reverse=True)
+        )) if self._names_lc else None
     
     def _create_sample_medicines(self):
         """Create sample medicine data if CSV not found"""
         sample_medicines = {
-            'paracetamol': {
+            'paracetamol': Medicine.from_dict({
                 'name': 'Paracetamol',
                 'generic_name': 'Acetaminophen',
                 'class': 'Analgesic/Antipyretic',
@@ -174,15 +402,15 @@ class MedicineDataLoader:
                 'mechanism': 'Inhibits prostaglandin synthesis',
                 'onset': '30 minutes',
                 'duration': '4-6 hours'
-            }
+            })
         }
         self.medicines = sample_medicines
         print("⚠ Using sample medicine data (create data/medicines.csv for full database)")
     
-    def _create_sample_interactions(self):
+    def _create_sample_interactions(self) -> Dict[frozenset, Dict]:
         """Create sample interaction data if CSV not found"""
-        self.interactions = {
-            ('paracetamol', 'alcohol'): {
+        interactions = {
+            frozenset(('paracetamol', 'alcohol')): {
                 'severity': 'High',
                 'effect': 'Increased risk of liver damage',
                 'recommendation': 'Avoid or limit alcohol consumption',
@@ -190,80 +418,74 @@ class MedicineDataLoader:
             }
         }
         print("⚠ Using sample interaction data (create data/interactions.csv for full database)")
+        return interactions
     
-    def search_medicine(self, query: str) -> Optional[Dict]:
+    def _search_medicine_impl(self, query: str) -> Optional[Medicine]:
         """
         Search for medicine by name (case-insensitive, partial match)
-        Returns the best matching medicine or None
+        Returns the best matching medicine or None; among partial name
+        matches the first in dataset order wins
         """
         query = query.lower().strip()
         
-        # 1. Exact match
+        # 1. Exact match on name, generic name or brand name
         if query in self.medicines:
             return self.medicines[query]
+        if query in self._by_generic_lower:
+            return self._by_generic_lower[query][0]
+        if query in self._by_brand_lower:
+            return self._by_brand_lower[query][0]
         
-        # 2. Check in medicine names
-        for med_name, med_data in self.medicines.items():
-            if query in med_name or med_name in query:
-                return med_data
+        # 2. Check in medicine names: the first medicine in dataset order
+        # whose name contains the query or is contained in it. The packed
+        # buffer finds the first name containing the query; the alternation
+        # only tells whether any name occurs in the query, and only then are
+        # the names before that slot checked one by one
+        slot = len(self._entries)
+        if '\n' not in query:
+            pos = self._names_buffer.find(query)
+            if pos != -1:
+                slot = bisect_right(self._names_starts, pos) - 1
+        if self._names_pattern is not None and self._names_pattern.search(query):
+            for i in range(slot):
+                if self._names_lc[i] in query:
+                    return self._entries[i]
+        if slot < len(self._entries):
+            return self._entries[slot]
         
         # 3. Check in generic names
-        for med_data in self.medicines.values():
-            generic_lower = med_data['generic_name'].lower()
+        for generic_lower, meds in self._by_generic_lower.items():
             if query in generic_lower:
-                return med_data
+                return meds[0]
         
         # 4. Check in brand names
-        for med_data in self.medicines.values():
-            for brand in med_data.get('brand_names', []):
-                if query in brand.lower():
-                    return med_data
+        for brand_lower, meds in self._by_brand_lower.items():
+            if query in brand_lower:
+                return meds[0]
         
         return None
     
-    def search_all_medicines(self, query: str) -> List[Dict]:
-        """Search for all medicines matching query"""
+    def search_all_medicines(self, query: str) -> List[Medicine]:
+        """Search for all medicines matching query, in dataset order"""
         query = query.lower().strip()
-        results = []
-        
-        for med_name, med_data in self.medicines.items():
-            # Check name
-            if query in med_name:
-                results.append(med_data)
-                continue
-            
-            # Check generic name
-            if query in med_data['generic_name'].lower():
-                results.append(med_data)
-                continue
-            
-            # Check brand names
-            for brand in med_data.get('brand_names', []):
-                if query in brand.lower():
-                    results.append(med_data)
-                    break
-        
-        return results
+        matches = chain(
+            ((name_lc, (entry,)) for name_lc, entry in zip(self._names_lc, self._entries)),
+            self._by_generic_lower.items(),
+            self._by_brand_lower.items()
+        )
+        # Collected by id() so a medicine matched several ways appears once,
+        # then emitted in _entries order like the per-medicine scan it replaced
+        hits = {id(med) for key, meds in matches if query in key for med in meds}
+        return [med for med in self._entries if id(med) in hits]
     
-    def check_interaction(self, med1: str, med2: str) -> Optional[Dict]:
+    def _check_interaction_impl(self, med1: str, med2: str) -> Optional[Dict]:
         """
         Check interaction between two medicines
         Returns interaction data or None if no interaction found
         """
         med1_lower = med1.lower().strip()
         med2_lower = med2.lower().strip()
-        
-        # Try direct key
-        key = (med1_lower, med2_lower)
-        if key in self.interactions:
-            return self.interactions[key]
-        
-        # Try reverse key
-        key_rev = (med2_lower, med1_lower)
-        if key_rev in self.interactions:
-            return self.interactions[key_rev]
-        
-        return None
+        return self.interactions.get(frozenset((med1_lower, med2_lower)))
     
     def get_brands(self, medicine_name: str) -> List[Dict]:
         """Get brand names for a medicine"""
@@ -271,17 +493,41 @@ class MedicineDataLoader:
         if not med_data:
             return []
         
-        generic_name = med_data['generic_name'].lower()
+        generic_name = med_data.generic_name.lower()
         return self.brands.get(generic_name, [])
     
-    def get_all_medicines(self) -> List[Dict]:
+    def get_all_medicines(self) -> List[Medicine]:
         """Get all medicines in the database"""
         return list(self.medicines.values())
     
-    def get_medicine_by_class(self, medicine_class: str) -> List[Dict]:
+    def get_medicine_by_class(self, medicine_class: str) -> List[Medicine]:
         """Get all medicines in a specific class"""
         medicine_class = medicine_class.lower()
+        # Scan the handful of distinct classes rather than every medicine
         return [
-            med for med in self.medicines.values()
-            if medicine_class in med['class'].lower()
-        ]
\ No newline at end of file
+            med for class_lower, meds in self._by_class.items()
+            if medicine_class in class_lower
+            for med in meds
+        ]
+
+
+def migrate(data_dir: str = "data") -> Path:
+    """Convert medicines.csv into the medicines.json snapshot"""
+    data_path = Path(data_dir)
+    csv_file = data_path / "medicines.csv"
+    if not csv_file.exists():
+        raise FileNotFoundError(csv_file)
+    
+    # Parse the CSV alone, so a bad file raises instead of falling back
+    # to the sample data
+    medicines = [med.to_dict() for med in _parse_medicines_csv(csv_file).values()]
+    json_file = data_path / "medicines.json"
+    json_file.write_bytes(orjson.dumps(medicines, option=orjson.OPT_INDENT_2))
+    return json_file
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["migrate"]:
+        print(f"✓ Wrote {migrate()}")
+    else:
+        print("Usage: python -m utils.data_loader migrate")
\ No newline at end of file